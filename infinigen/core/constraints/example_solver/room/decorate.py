@@ -93,8 +93,12 @@ def room_walls(wall_objs: list[bpy.types.Object]):
 
     logger.debug(f'{room_walls.__name__} adding materials to {len(wall_objs)=}, using {len(wall_fns)=}')
 
+    rooms_by_fn = {}
+    for o, w in zip(wall_objs, wall_fns):
+        rooms_by_fn.setdefault(w, []).append(o)
+
     for wall_fn in set(wall_fns):
-        rooms_ = [o for o, w in zip(wall_objs, wall_fns) if w == wall_fn]
+        rooms_ = rooms_by_fn[wall_fn]
         shape = np.random.choice(['square', 'rectangle', 'hexagon'])
         kwargs = dict(vertical=True, alternating=False, shape=shape)
         if wall_fn in [tile, plaster]:
@@ -114,8 +118,12 @@ def room_ceilings(ceilings: list[bpy.types.Object]):
 def room_floors(floors: list[bpy.types.Object]):
     floor_fns = list(rg(ROOM_FLOORS[get_room_type(r.name)]) for r in floors)
     logger.debug(f'{room_floors.__name__} adding materials to {len(floors)=}, using {len(floor_fns)=}')
+    rooms_by_fn = {}
+    for o, f in zip(floors, floor_fns):
+        rooms_by_fn.setdefault(f, []).append(o)
+
     for floor_fn in set(floor_fns):
-        rooms_ = [o for o, f in zip(floors, floor_fns) if f == floor_fn]
+        rooms_ = rooms_by_fn[floor_fn]
 
         if floor_fn in [tile, plaster]:
             indices = np.random.randint(0, 3, len(rooms_))
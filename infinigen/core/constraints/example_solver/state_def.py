@@ -101,7 +101,12 @@ class State:
             semantics = {tg for tg in t.decompose_tags(v.tags)[0] if not isinstance(tg, t.SpecificObject)}
             print(f"  {v.obj.name} {semantics} [{relations}]")
 
-    def to_json(self, path: Path):
+    def to_json(self, path: Path, indent: int = None):
+
+        """Write objs to json at `path`.
+
+        Leave indent=None for large states: json only uses its C encoder for unindented output.
+        """
 
         JSON_SUPPORTED_TYPES = (
             int, float, str, bool, list, dict
@@ -140,15 +145,16 @@ class State:
             'objs': self.objs,
         }
 
+        # json.dumps rather than json.dump, streaming to the file always uses the pure-python encoder
+        text = json.dumps(
+            data,
+            default=preprocess_field,
+            sort_keys=True, 
+            indent=indent,
+            check_circular=True
+        )
         with path.open('w') as f:
-            json.dump(
-                data,
-                f, 
-                default=preprocess_field,
-                sort_keys=True, 
-                indent=4,
-                check_circular=True
-            )
+            f.write(text)
 
     def __post_init__(self):
         bpy_objs = [o.obj for o in self.objs.values() if o.obj is not None]
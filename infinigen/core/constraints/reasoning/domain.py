@@ -101,7 +101,7 @@ def domain_finalized(dom: Domain, check_anyrel=False, check_variable=True):
         
     return True
 
-@dataclass
+@dataclass(slots=True)
 class Domain:
 
     '''
@@ -171,9 +171,12 @@ def min_dists_from_cam_trajectory(points, cam, start=None, end=None, verbose=Fal
     return min_dists, min_vis_dists
 
 
+def _points_inview_kernel(points, proj, res_x, res_y):
+    # apply the 3x4 projection as rotation + translation, avoids building homogeneous coords
+    x, y, z = (points @ proj[:, :3].T + proj[:, 3]).T
+    return (z > 0) & (x >= 0) & (y >= 0) & (x / z < res_x) & (y / z < res_y)
+
 def points_inview(bbox, camera):
     proj = np.array(get_3x4_P_matrix_from_blender(camera)[0])
-    x, y, z = proj @ np.concatenate([bbox, np.ones((len(bbox), 1))], -1).T
     render = bpy.context.scene.render
-    inview = (z > 0) & (x >= 0) & (y >= 0) & (x / z < render.resolution_x) & (y / z < render.resolution_y)
-    return inview
+    return _points_inview_kernel(np.asarray(bbox, dtype=float), proj, render.resolution_x, render.resolution_y)
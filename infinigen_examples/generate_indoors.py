@@ -6,9 +6,9 @@ import argparse
 from pathlib import Path
 import logging
 from time import time
-from numpy import deg2rad
 import pprint
 import copy
+import functools
 
 logging.basicConfig(
     format='[%(asctime)s.%(msecs)03d] [%(module)s] [%(levelname)s] | %(message)s',
@@ -23,7 +23,6 @@ import numpy as np
 import trimesh
 from numpy import deg2rad
 
-from infinigen.assets import (lighting)
 from infinigen.assets.wall_decorations.skirting_board import make_skirting_board
 from infinigen.assets.utils.decorate import read_co
 from infinigen.terrain import Terrain
@@ -40,7 +39,6 @@ from infinigen.core.constraints import (
 from infinigen.assets import (
     fluid, 
     cactus, 
-    cactus, 
     trees, 
     monocot, 
     rocks, 
@@ -50,7 +48,6 @@ from infinigen.assets import (
     weather
 )
 from infinigen.assets.scatters import grass, pebbles
-from infinigen.assets.utils.decorate import read_co
 
 from infinigen.core.placement import density, camera as cam_util, split_in_view
 
@@ -69,7 +66,7 @@ from infinigen.core.constraints.example_solver.room import decorate as room_dec,
 from infinigen.core.constraints.example_solver import state_def, greedy, populate, Solver
 
 from infinigen.core.constraints.example_solver.room.constants import WALL_HEIGHT
-from infinigen.core.util.camera import points_inview
+from infinigen.core.util.camera import get_calibration_matrix_K_from_blender
 
 from infinigen_examples.generate_nature import compose_nature # so gin can find it
 from infinigen_examples.util import constraint_util as cu
@@ -84,13 +81,8 @@ from infinigen_examples.util.generate_indoors_util import (
 
 logger = logging.getLogger(__name__)
 
-def default_greedy_stages():
-
-    """Returns descriptions of what will be covered by each greedy stage of the solver.
-
-    Any domain containing one or more VariableTags is greedy: it produces many separate domains, 
-        one for each possible assignment of the unresolved variables.
-    """
+@functools.lru_cache(maxsize=1)
+def _default_greedy_stages():
 
     on_floor = cl.StableAgainst({}, cu.floortags)
     on_wall = cl.StableAgainst({}, cu.walltags)
@@ -130,6 +122,18 @@ def default_greedy_stages():
 
     return greedy_stages
 
+def default_greedy_stages():
+
+    """Returns descriptions of what will be covered by each greedy stage of the solver.
+
+    Any domain containing one or more VariableTags is greedy: it produces many separate domains, 
+        one for each possible assignment of the unresolved variables.
+    """
+
+    # stages only depend on constants so are built once per process, but Domains are mutable 
+    # and callers (e.g. apply_greedy_restriction) modify the dict, so always hand out a copy
+    return copy.deepcopy(_default_greedy_stages())
+
 
 all_vars = [cu.variable_room, cu.variable_obj]
 
@@ -182,19 +186,28 @@ def compose_indoors(output_folder: Path, scene_seed: int, **overrides):
         return solver.solve_rooms(scene_seed, consgraph, stages['rooms'])
     state: state_def.State = p.run_stage('solve_rooms', solve_rooms, use_chance=False)
 
-    def solve_large():
+    def solve_stage_name(stage_name: str, n_steps: int, nonempty=False, **kwargs):
+
+        """Greedily solve each variable assignment of one stage, in order."""
+
+        stage = stages[stage_name]
         assignments = greedy.iterate_assignments(
-            stages['on_floor'], state, all_vars, limits, nonempty=True
+            stage, state, all_vars, limits, nonempty=nonempty
         )
         for i, vars in enumerate(assignments):
             solver.solve_objects(
                 consgraph, 
-                stages['on_floor'], 
+                stage, 
                 var_assignments=vars, 
-                n_steps=overrides['solve_steps_large'], 
-                desc=f"on_floor_{i}", 
-                abort_unsatisfied=overrides.get('abort_unsatisfied_large', False)
+                n_steps=n_steps, 
+                desc=f"{stage_name}_{i}", 
+                **kwargs
             )
+
+    def solve_large():
+        n_steps = overrides['solve_steps_large']
+        abort_unsatisfied = overrides.get('abort_unsatisfied_large', False)
+        solve_stage_name('on_floor', n_steps, nonempty=True, abort_unsatisfied=abort_unsatisfied)
         return solver.state
     state = p.run_stage('solve_large', solve_large, use_chance=False, default=state)
 
@@ -204,11 +217,25 @@ def compose_indoors(output_folder: Path, scene_seed: int, **overrides):
             stages['on_floor'], state, [cu.variable_room], limits
         )
     ]    
-    solved_bound_points = np.concatenate([butil.bounds(r) for r in solved_rooms])
-    solved_bbox = (np.min(solved_bound_points, axis=0), np.max(solved_bound_points, axis=0))
 
-    house_bbox = np.concatenate([butil.bounds(obj) for obj in solver.get_bpy_objects(r.Domain({t.Semantics.Room}))])
-    house_bbox = (np.min(house_bbox, axis=0), np.max(house_bbox, axis=0))
+    # solved_rooms is a subset of all rooms, so share bounds between both bboxes.
+    # only valid until room meshes are modified by the decoration stages below
+    bounds_cache = {}
+    def bounds_cached(o):
+        if o.name not in bounds_cache:
+            bounds_cache[o.name] = butil.bounds(o)
+        return bounds_cache[o.name]
+
+    def combined_bbox(objs):
+        mins, maxs = np.full(3, np.inf), np.full(3, -np.inf)
+        for o in objs:
+            omin, omax = bounds_cached(o)
+            np.minimum(mins, omin, out=mins)
+            np.maximum(maxs, omax, out=maxs)
+        return mins, maxs
+
+    solved_bbox = combined_bbox(solved_rooms)
+    house_bbox = combined_bbox(solver.get_bpy_objects(r.Domain({t.Semantics.Room})))
 
     camera_rigs = placement.camera.spawn_camera_rigs()
 
@@ -254,21 +281,15 @@ def compose_indoors(output_folder: Path, scene_seed: int, **overrides):
     
     def solve_medium():
         n_steps = overrides['solve_steps_medium']
-        for i, vars in enumerate(greedy.iterate_assignments(stages['on_wall'], state, all_vars, limits)):
-            solver.solve_objects(consgraph, stages['on_wall'], vars, n_steps, desc=f"on_wall_{i}")
-        for i, vars in enumerate(greedy.iterate_assignments(stages['on_ceiling'], state, all_vars, limits)):
-            solver.solve_objects(consgraph, stages['on_ceiling'], vars, n_steps, desc=f"on_ceiling_{i}")
-        for i, vars in enumerate(greedy.iterate_assignments(stages['side_obj'], state, all_vars, limits)):
-            solver.solve_objects(consgraph, stages['side_obj'], vars, n_steps, desc=f"side_obj_{i}")
+        for stage_name in ['on_wall', 'on_ceiling', 'side_obj']:
+            solve_stage_name(stage_name, n_steps)
         return solver.state
     state = p.run_stage('solve_medium', solve_medium, use_chance=False, default=state)
 
     def solve_small():
         n_steps = overrides['solve_steps_small']
-        for i, vars in enumerate(greedy.iterate_assignments(stages['obj_ontop_obj'], state, all_vars, limits)):
-            solver.solve_objects(consgraph, stages['obj_ontop_obj'], vars, n_steps, desc=f"obj_ontop_obj_{i}")
-        for i, vars in enumerate(greedy.iterate_assignments(stages['obj_on_support'], state, all_vars, limits)):
-            solver.solve_objects(consgraph, stages['obj_on_support'], vars, n_steps, desc=f"obj_on_support_{i}")
+        for stage_name in ['obj_ontop_obj', 'obj_on_support']:
+            solve_stage_name(stage_name, n_steps)
         #for i, vars in enumerate(greedy.iterate_assignments(stages['tertiary'], state, all_vars, limits)):
         #    solver.solve_objects(consgraph, stages['tertiary'], vars, n_steps, desc=f"tertiary_{i}")
         return solver.state
@@ -281,6 +302,7 @@ def compose_indoors(output_folder: Path, scene_seed: int, **overrides):
     p.run_stage('room_doors', lambda: room_dec.populate_doors(solver.get_bpy_objects(door_filter)), use_chance=False)
     p.run_stage('room_windows', lambda: room_dec.populate_windows(solver.get_bpy_objects(window_filter)), use_chance=False)
 
+    # re-query, populate_assets swaps each room's obj for its .meshed version
     room_meshes = solver.get_bpy_objects(r.Domain({t.Semantics.Room}))
     p.run_stage('room_stairs', lambda: room_dec.room_stairs(state, room_meshes), use_chance=False)
     p.run_stage('skirting_floor', lambda: make_skirting_board(room_meshes, t.Subpart.SupportSurface))
@@ -300,17 +322,22 @@ def compose_indoors(output_folder: Path, scene_seed: int, **overrides):
     cam = cam_util.get_camera(0, 0)
     
     def turn_off_lights():
-        for o in bpy.data.objects:
-            if o.type == 'LIGHT' and not o.data.cycles.is_portal:
-                print(f'Deleting {o.name}')
-                butil.delete(o)
+        lights = [o for o in bpy.data.objects if o.type == 'LIGHT' and not o.data.cycles.is_portal]
+        for o in lights:
+            print(f'Deleting {o.name}')
+            butil.delete(o)
     p.run_stage('lights_off', turn_off_lights)
 
     def invisible_room_ceilings():
         rooms_split['exterior'].hide_viewport = True
         rooms_split['exterior'].hide_render = True
         invisible_to_camera.apply(list(rooms_split['ceiling'].objects))        
-        invisible_to_camera.apply([o for o in bpy.data.objects if 'CeilingLight' in o.name])
+        ceiling_lights = [
+            o 
+            for os in state.objs.values() if t.Semantics.CeilingLight in os.tags
+            for o in butil.iter_object_tree(os.obj)
+        ]
+        invisible_to_camera.apply(ceiling_lights)
     p.run_stage('invisible_room_ceilings', invisible_room_ceilings, use_chance=False)
 
     p.run_stage(
@@ -358,21 +385,29 @@ def compose_indoors(output_folder: Path, scene_seed: int, **overrides):
         camera = camera_rigs[0].children[0]
         camera_rigs[0].location = 0, 0, 0
         camera_rigs[0].rotation_euler = 0, 0, 0
-        bpy.contexScene.camera = camera
+        bpy.context.scene.camera = camera
         rot_x = deg2rad(overrides.get('topview_rot_x', 0))
         rot_z = deg2rad(overrides.get('topview_rot_z', 0))
         camera.rotation_euler = rot_x, 0, rot_z
         mean = np.mean(bbox, 0)
-        for cam_dist in np.exp(np.linspace(1., 5., 500)):
-            camera.location = mean[0] + cam_dist * np.sin(rot_x) * np.sin(rot_z), mean[1] - cam_dist * np.sin(
-                rot_x) * np.cos(rot_z), mean[2] - WALL_HEIGHT / 2 + cam_dist * np.cos(rot_x)
-            bpy.context.view_layer.update()
-            inview = points_inview(bbox, camera)
-            if inview.all():
-                for area in bpy.contexScreen.areas:
-                    if area.type == 'VIEW_3D':
-                        area.spaces.active.region_3d.view_perspective = 'CAMERA'
-                        break
+        target = mean - np.array([0, 0, WALL_HEIGHT / 2])
+
+        # solve for the closest camera distance along the camera's local +z axis which keeps every point in view
+        rot = np.array(camera.rotation_euler.to_matrix())
+        local = (bbox - target) @ rot
+        # half-fov tangents from the same intrinsics points_inview uses, so sensor_fit and aspect are respected
+        K = np.array(get_calibration_matrix_K_from_blender(camera.data))
+        render = bpy.context.scene.render
+        tan_x = min(K[0, 2], render.resolution_x - K[0, 2]) / K[0, 0]
+        tan_y = min(K[1, 2], render.resolution_y - K[1, 2]) / K[1, 1]
+        dist_needed = np.maximum(np.abs(local[:, 0]) / tan_x, np.abs(local[:, 1]) / tan_y) + local[:, 2]
+        cam_dist = max(dist_needed.max(), np.exp(1.))
+
+        camera.location = target + cam_dist * rot[:, 2]
+        bpy.context.view_layer.update()
+        for area in bpy.context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.spaces.active.region_3d.view_perspective = 'CAMERA'
                 break
     
     return {
@@ -116,27 +116,45 @@ def place_cam_overhead(cam: bpy.types.Object, bbox: tuple[np.array]):
     mins, maxs = bbox
     cam.location = (maxs + mins) / 2
     cam.rotation_euler = (0, 0, 0)
-    for cam_dist in np.exp(np.linspace(-1., 5.5, 500)):
-        cam.location[-1] = cam_dist
+
+    cam_dists = np.exp(np.linspace(-1., 5.5, 500))
+    def all_inview(i):
+        cam.location[-1] = cam_dists[i]
         bpy.context.view_layer.update()
-        inview = points_inview(bbox, cam.children[0])
-        if inview.all():
-            for area in bpy.context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.spaces.active.region_3d.view_perspective = 'CAMERA'
-                    break
-            return
+        return points_inview(bbox, cam.children[0]).all()
+
+    if not all_inview(len(cam_dists) - 1):
+        return
+
+    # raising the camera never moves points out of view, so binary search for the lowest distance which fits
+    lo, hi = 0, len(cam_dists) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if all_inview(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    cam.location[-1] = cam_dists[lo]
+    bpy.context.view_layer.update()
+
+    for area in bpy.context.screen.areas:
+        if area.type == 'VIEW_3D':
+            area.spaces.active.region_3d.view_perspective = 'CAMERA'
+            break
 
 
 def overhead_view(cam, room_name):
     room_name = room_name.split('.')[0]
     
-    for o in bpy.data.objects:
-        if '.exterior' in o.name:
-            o.hide_viewport = True
-            o.hide_render = True
-        elif '.ceiling' in o.name:
-            invisible_to_camera.apply(o)
+    # room_dec.split_rooms already groups exterior/ceiling meshes into their own collections,
+    # so hide those directly instead of scanning every object in the scene by name
+    exterior = bpy.data.collections.get('unique_assets:room_exterior')
+    if exterior is not None:
+        exterior.hide_viewport = True
+        exterior.hide_render = True
+    ceiling = bpy.data.collections.get('unique_assets:room_ceiling')
+    if ceiling is not None:
+        invisible_to_camera.apply(list(ceiling.objects))
 
     floor = bpy.data.objects[room_name + '.floor']
     cam.location = floor.location + Vector((0, 0, 10))
@@ -154,13 +172,13 @@ def hide_other_rooms(state, rooms_split, keep_rooms: list[str]):
             o.hide_viewport = True
             o.hide_render = True
 
+    keep_rooms_set = set(keep_rooms)
     hide_cutters = [
         o 
         for k, os in state.objs.items()
         if t.Semantics.Cutter in os.tags and not any(
-            rel.target_name == roomname
+            rel.target_name in keep_rooms_set
             for rel in os.relations
-            for roomname in keep_rooms
         )
         for o in butil.iter_object_tree(os.obj)
     ]
@@ -0,0 +1,47 @@
+# Copyright (c) Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory
+# of this source tree.
+
+import numpy as np
+
+from infinigen.core.util.camera import _points_inview_kernel
+
+def test_points_inview_kernel():
+
+    # 100x100 image, focal length 100px, principal point at the center, camera at origin looking down +z
+    K = np.array([
+        [100, 0, 50],
+        [0, 100, 50],
+        [0, 0, 1]
+    ], dtype=float)
+    proj = np.concatenate([K, np.zeros((3, 1))], axis=-1)
+
+    points = np.array([
+        [0, 0, 1],        # center of frame
+        [-0.4, 0.4, 2],   # in front, off-center
+        [0, 0, -1],       # behind the camera
+        [1, 0, 1],        # off the right edge
+        [0, -1, 1],       # off the top edge
+        [0.5, 0, 1],      # exactly on the right edge, excluded
+    ], dtype=float)
+
+    inview = _points_inview_kernel(points, proj, 100, 100)
+    assert inview.tolist() == [True, True, False, False, False, False]
+
+def test_points_inview_kernel_translation():
+
+    K = np.array([
+        [100, 0, 50],
+        [0, 100, 50],
+        [0, 0, 1]
+    ], dtype=float)
+    RT = np.concatenate([np.eye(3), [[0], [0], [5]]], axis=-1)
+    proj = K @ RT
+
+    points = np.array([
+        [0, 0, -4],     # 1 unit in front of the camera once translated
+        [0, 0, -6],     # behind the camera once translated
+    ], dtype=float)
+
+    inview = _points_inview_kernel(points, proj, 100, 100)
+    assert inview.tolist() == [True, False]
@@ -304,4 +304,22 @@ def test_room_has_viols_at_init(rtype):
 
         
 
-    
\ No newline at end of file
+    
+def test_default_greedy_stages_independent_copies():
+
+    stages = generate_indoors.default_greedy_stages()
+    orig_on_floor = repr(stages['on_floor'])
+    orig_keys = set(stages.keys())
+
+    # mimic callers like apply_greedy_restriction which modify the returned stages in place
+    stages['on_floor'].tags.add(t.Semantics.Bedroom)
+    stages['on_floor'].relations.clear()
+    stages['rooms'] = r.Domain({t.Semantics.Kitchen})
+    del stages['on_wall']
+
+    fresh = generate_indoors.default_greedy_stages()
+    assert set(fresh.keys()) == orig_keys
+    assert repr(fresh['on_floor']) == orig_on_floor
+    assert t.Semantics.Bedroom not in fresh['on_floor'].tags
+    assert t.Semantics.Kitchen not in fresh['rooms'].tags
+    assert fresh['on_floor'] is not stages['on_floor']